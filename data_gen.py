@@ -36,7 +36,8 @@ def generate_doctor_schedule():
                     "doctor": doctor,
                     "date": current_date.strftime("%Y-%m-%d"),
                     "time": time.strftime("%H:%M"),
-                    "status": "available"
+                    "status": "available",
+                    "appointment_id": None
                 })
 
     df = pd.DataFrame(schedule_data)
@@ -23,6 +23,18 @@ def init_db():
         reminders_sent INTEGER DEFAULT 0,
         created_at TEXT DEFAULT CURRENT_TIMESTAMP
     )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS waitlist (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        patient_id INTEGER,
+        doctor TEXT,
+        duration INTEGER,
+        status TEXT DEFAULT 'waiting',
+        appointment_id INTEGER,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )""")
+    # Freed slots are matched by doctor in FIFO order, so index exactly that lookup
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_waitlist_doctor_status
+                 ON waitlist (doctor, status, id)""")
     conn.commit(); conn.close()
 
 def find_patient_by_name_dob(last_name, dob):
@@ -50,4 +62,84 @@ def create_appointment(patient_id, doctor, scheduled_time, duration):
     c.execute("""INSERT INTO appointments (patient_id,doctor,scheduled_time,duration,status)
                  VALUES (?,?,?,?,?)""", (patient_id,doctor,scheduled_time,duration,"confirmed"))
     aid = c.lastrowid; conn.commit(); conn.close()
-    return aid
\ No newline at end of file
+    return aid
+
+def get_patient_by_id(patient_id):
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("SELECT * FROM patients WHERE id=?",(patient_id,))
+    row = c.fetchone(); conn.close()
+    return row
+
+def get_appointment(appointment_id):
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("""SELECT id,patient_id,doctor,scheduled_time,duration,status
+                 FROM appointments WHERE id=?""",(appointment_id,))
+    row = c.fetchone(); conn.close()
+    return row
+
+def get_confirmed_appointments():
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("""SELECT id,doctor,scheduled_time,duration FROM appointments
+                 WHERE status='confirmed' ORDER BY id""")
+    rows = c.fetchall(); conn.close()
+    return rows
+
+def update_appointment(appointment_id, status=None, scheduled_time=None):
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    if status is not None:
+        c.execute("UPDATE appointments SET status=? WHERE id=?",(status,appointment_id))
+    if scheduled_time is not None:
+        c.execute("UPDATE appointments SET scheduled_time=? WHERE id=?",(scheduled_time,appointment_id))
+    conn.commit(); conn.close()
+
+def add_to_waitlist(patient_id, doctor, duration):
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("""INSERT INTO waitlist (patient_id,doctor,duration,status)
+                 VALUES (?,?,?,?)""", (patient_id,doctor.lower(),duration,"waiting"))
+    wid = c.lastrowid; conn.commit(); conn.close()
+    return wid
+
+def find_waitlist_entry(patient_id, doctor):
+    """Id of the patient's open entry on this doctor's waitlist, if any."""
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("""SELECT id FROM waitlist WHERE patient_id=? AND doctor=? AND status='waiting'
+                 LIMIT 1""",(patient_id,doctor.lower()))
+    row = c.fetchone(); conn.close()
+    return row[0] if row else None
+
+def get_waitlist_for_doctor(doctor):
+    """Waiting entries for one doctor, oldest first."""
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("""SELECT id,patient_id,duration FROM waitlist
+                 WHERE doctor=? AND status='waiting' ORDER BY id""",(doctor.lower(),))
+    rows = c.fetchall(); conn.close()
+    return rows
+
+def mark_waitlist_filled(waitlist_id, appointment_id):
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("UPDATE waitlist SET status='filled', appointment_id=? WHERE id=?",
+              (appointment_id,waitlist_id))
+    conn.commit(); conn.close()
+
+def close_waitlist_entries(patient_id, doctor, appointment_id):
+    """Mark the patient's open entry for this doctor filled once they book by any route."""
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("""UPDATE waitlist SET status='filled', appointment_id=?
+                 WHERE patient_id=? AND doctor=? AND status='waiting'""",
+              (appointment_id,patient_id,doctor.lower()))
+    conn.commit(); conn.close()
+
+def has_upcoming_appointment(patient_id, doctor, after_time):
+    """Whether the patient already holds a confirmed appointment with this doctor after `after_time` (YYYY-MM-DD HH:MM)."""
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("""SELECT 1 FROM appointments
+                 WHERE patient_id=? AND lower(doctor)=? AND status='confirmed' AND scheduled_time>?
+                 LIMIT 1""",(patient_id,doctor.lower(),after_time))
+    row = c.fetchone(); conn.close()
+    return bool(row)
+
+def mark_waitlist_waiting(waitlist_id):
+    """Put a waitlist entry back in the queue (used when its booking is rolled back)."""
+    conn = sqlite3.connect(DB_FILE); c = conn.cursor()
+    c.execute("UPDATE waitlist SET status='waiting', appointment_id=NULL WHERE id=?",(waitlist_id,))
+    conn.commit(); conn.close()
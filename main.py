@@ -11,10 +11,16 @@ from langgraph.graph import StateGraph, END
 import pandas as pd
 import json
 
-from db import init_db, find_patient_by_name_dob, create_patient, create_appointment
+from db import (init_db, find_patient_by_name_dob, create_patient, create_appointment,
+                get_patient_by_id, get_appointment, update_appointment,
+                add_to_waitlist, find_waitlist_entry, get_waitlist_for_doctor,
+                mark_waitlist_filled, close_waitlist_entries, has_upcoming_appointment)
 from data_gen import generate_doctor_schedule
 from email_utils import send_email_with_pdf
 from scheduler import schedule_3_reminders
+from slot_cache import slot_cache
+from schedule_utils import (load_schedule, save_schedule_or_rollback, find_free_blocks,
+                            claim_blocks, release_blocks, migrate_legacy_bookings)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -51,6 +57,27 @@ class BookSlotInput(BaseModel):
     member_id: str = Field(..., description="Patient's insurance member ID")
     group_number: str = Field(..., description="Patient's insurance group number")
 
+class CancelAppointmentInput(BaseModel):
+    appointment_id: int = Field(..., description="The ID of the appointment to cancel")
+    last_name: str = Field(..., description="Patient's last name, used to verify the appointment owner")
+    dob: str = Field(..., description="Patient's date of birth in YYYY-MM-DD format, used to verify the appointment owner")
+
+class RescheduleAppointmentInput(BaseModel):
+    appointment_id: int = Field(..., description="The ID of the appointment to move")
+    last_name: str = Field(..., description="Patient's last name, used to verify the appointment owner")
+    dob: str = Field(..., description="Patient's date of birth in YYYY-MM-DD format, used to verify the appointment owner")
+    new_slot_date: str = Field(..., description="The new date of the appointment in YYYY-MM-DD format")
+    new_slot_time: str = Field(..., description="The new time of the appointment in HH:MM format")
+
+class JoinWaitlistInput(BaseModel):
+    first_name: str = Field(..., description="Patient's first name")
+    last_name: str = Field(..., description="Patient's last name")
+    dob: str = Field(..., description="Patient's date of birth in YYYY-MM-DD format")
+    phone: str = Field(..., description="Patient's phone number")
+    email: str = Field(..., description="Patient's email address")
+    doctor: str = Field(..., description="Name of the doctor to wait for")
+    duration_minutes: int = Field(..., description="The required appointment duration (either 30 or 60 minutes)")
+
 @tool("lookup_patient", args_schema=PatientLookupInput)
 def lookup_patient_tool(first_name: str, last_name: str, dob: str) -> dict:
     """
@@ -74,41 +101,179 @@ def list_available_slots_tool(doctor: str, duration_minutes: int) -> list:
     Assumes schedule has 30-minute blocks. For 60-min slots, it finds two consecutive 30-min blocks.
     """
     DOCTOR_SCHEDULE_FILE = "doctor_schedule.xlsx"
+    # Normalise once so the cache key and the schedule filter agree on the name
+    doctor = doctor.strip()
+    cache_key = slot_cache.make_key(doctor, duration_minutes)
+    cached = slot_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = slot_cache.generation(doctor)
+
     try:
-        df = pd.read_excel(DOCTOR_SCHEDULE_FILE)
-        df['datetime'] = pd.to_datetime(df['date'].astype(str) + ' ' + df['time'].astype(str))
-        df = df.sort_values(by=['doctor', 'datetime'])
-        
-        available = df[(df['doctor'].str.lower() == doctor.lower()) & (df['status'] == "available")]
-        
-        if duration_minutes == 30:
-            return available[['date', 'time']].head(5).to_dict('records')
-        
-        elif duration_minutes == 60:
-            slots_60min = []
-            available_indices = available.index.tolist()
-            for i in range(len(available_indices) - 1):
-                idx1 = available_indices[i]
-                idx2 = available_indices[i+1]
-                
-                row1 = available.loc[idx1]
-                row2 = available.loc[idx2]
-                
-                if (row2['datetime'] - row1['datetime'] == pd.Timedelta(minutes=30)):
-                    slots_60min.append(row1)
+        slots = _compute_available_slots(DOCTOR_SCHEDULE_FILE, doctor, duration_minutes)
+    except Exception as e:
+        print(f"Error in list_available_slots: {e}")
+        return []
+
+    slot_cache.put(cache_key, slots, generation)
+    return slots
 
-            if not slots_60min:
-                return []
+def _compute_available_slots(schedule_file, doctor, duration_minutes):
+    """Scan the schedule file for the first 5 free slots of the given duration."""
+    df = pd.read_excel(schedule_file)
+    df['datetime'] = pd.to_datetime(df['date'].astype(str) + ' ' + df['time'].astype(str))
+    df = df.sort_values(by=['doctor', 'datetime'])
+    
+    available = df[(df['doctor'].str.lower() == doctor.lower()) & (df['status'] == "available")]
+    
+    if duration_minutes == 30:
+        return available[['date', 'time']].head(5).to_dict('records')
+    
+    elif duration_minutes == 60:
+        slots_60min = []
+        available_indices = available.index.tolist()
+        for i in range(len(available_indices) - 1):
+            idx1 = available_indices[i]
+            idx2 = available_indices[i+1]
             
-            return [{'date': s['date'], 'time': s['time']} for s in slots_60min][:5]
-        
-        else:
-            return [] 
+            row1 = available.loc[idx1]
+            row2 = available.loc[idx2]
             
-    except Exception as e:
-        print(f"Error in list_available_slots: {e}")
+            if (row2['datetime'] - row1['datetime'] == pd.Timedelta(minutes=30)):
+                slots_60min.append(row1)
+
+        if not slots_60min:
+            return []
+        
+        return [{'date': s['date'], 'time': s['time']} for s in slots_60min][:5]
+    
+    else:
         return []
 
+def _take_freed_blocks(df, freed, duration_minutes):
+    """Pick blocks for a waitlisted booking from the just-freed rows only (no schedule rescan)."""
+    if duration_minutes == 30:
+        return freed[:1] or None
+    if duration_minutes == 60:
+        for first, second in zip(freed, freed[1:]):
+            if df.at[second, 'datetime'] - df.at[first, 'datetime'] == pd.Timedelta(minutes=30):
+                return [first, second]
+    return None
+
+def _backfill_from_waitlist(df, doctor, freed, exclude_patient_id=None):
+    """
+    Offer freed capacity to the doctor's waitlist, oldest entry first. Skips the
+    patient who freed the slot and anyone already holding an upcoming visit with this doctor.
+    Marks the schedule in `df`; the caller saves it with `save_schedule_or_rollback`
+    and then sends the returned notifications.
+    """
+    # A slot that has already started can't be offered to anyone
+    now = pd.Timestamp.now()
+    freed = [idx for idx in freed if df.at[idx, 'datetime'] > now]
+    notifications = []
+    for waitlist_id, patient_id, duration in get_waitlist_for_doctor(doctor):
+        if not freed:
+            break
+        blocks = _take_freed_blocks(df, freed, duration)
+        if blocks is None:
+            continue
+        if patient_id == exclude_patient_id or has_upcoming_appointment(patient_id, doctor, now.strftime("%Y-%m-%d %H:%M")):
+            continue
+        patient = get_patient_by_id(patient_id)
+        if not patient:
+            continue
+
+        first_row = df.loc[blocks[0]]
+        scheduled_iso = f"{first_row['date']} {first_row['time']}"
+        aid = create_appointment(patient_id, first_row['doctor'], scheduled_iso, duration)
+        claim_blocks(df, blocks, aid)
+        mark_waitlist_filled(waitlist_id, aid)
+        freed = [idx for idx in freed if idx not in blocks]
+
+        notifications.append({
+            "appointment_id": aid,
+            "waitlist_id": waitlist_id,
+            "patient": patient,
+            "doctor": first_row['doctor'],
+            "slot_date": str(first_row['date']),
+            "slot_time": str(first_row['time']),
+            "duration": duration
+        })
+    return notifications
+
+def _send_waitlist_notifications(notifications):
+    for n in notifications:
+        _, first_name, last_name, _, phone, email, carrier, member_id, group_number = n["patient"][:9]
+        scheduled_iso = f"{n['slot_date']} {n['slot_time']}"
+        send_email_with_pdf(
+            email,
+            "Appointment Confirmation (from waitlist)",
+            f"Hello {first_name}, a slot opened up! Your {n['duration']}-minute appointment with {n['doctor']} is confirmed for {scheduled_iso}. An intake form is attached.",
+            attach_form=True
+        )
+        schedule_3_reminders(n["appointment_id"], scheduled_iso, email, f"{first_name} {last_name}")
+        _export_admin_row({
+            'appointment_id': n["appointment_id"],
+            'status': "confirmed",
+            'patient_name': f"{first_name} {last_name}",
+            'patient_email': email,
+            'patient_phone': phone,
+            'doctor': n["doctor"],
+            'appointment_date': n["slot_date"],
+            'appointment_time': n["slot_time"],
+            'duration': n["duration"],
+            'insurance_carrier': carrier,
+            'member_id': member_id,
+            'group_number': group_number
+        })
+
+def _export_admin_row(new_appointment_data):
+    """Append one appointment to the admin review file."""
+    ADMIN_REPORT_FILE = "admin_review.xlsx"
+    try:
+        # Try to read the existing file, or create a new dataframe
+        try:
+            admin_df = pd.read_excel(ADMIN_REPORT_FILE)
+        except FileNotFoundError:
+            admin_df = pd.DataFrame()
+
+        # Append the new appointment and save
+        admin_df = pd.concat([admin_df, pd.DataFrame([new_appointment_data])], ignore_index=True)
+        admin_df.to_excel(ADMIN_REPORT_FILE, index=False)
+
+    except Exception as e:
+        print(f"Error in admin export: {e}") # Don't crash the whole booking if this fails
+
+def _update_admin_row(appointment_id, updates):
+    """Reflect a cancellation or reschedule in the admin review file."""
+    ADMIN_REPORT_FILE = "admin_review.xlsx"
+    try:
+        admin_df = pd.read_excel(ADMIN_REPORT_FILE)
+        if 'appointment_id' not in admin_df.columns:
+            return
+        mask = admin_df['appointment_id'] == appointment_id
+        for column, value in updates.items():
+            admin_df.loc[mask, column] = value
+        admin_df.to_excel(ADMIN_REPORT_FILE, index=False)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error in admin update: {e}")
+
+def _verify_appointment_owner(appointment_id, last_name, dob):
+    """Return the appointment row if it exists and belongs to the given patient, else an error dict."""
+    appt = get_appointment(appointment_id)
+    if not appt:
+        return None, {"status": "error", "message": f"Appointment {appointment_id} was not found."}
+    patient = get_patient_by_id(appt[1])
+    if not patient or patient[2].lower() != last_name.lower() or patient[3] != dob:
+        return None, {"status": "error", "message": "The appointment does not match the patient details provided."}
+    if appt[5] != "confirmed":
+        return None, {"status": "error", "message": f"Appointment {appointment_id} is already {appt[5]}."}
+    if pd.to_datetime(appt[3]) <= pd.Timestamp.now():
+        return None, {"status": "error", "message": f"Appointment {appointment_id} has already started or taken place."}
+    return appt, None
+
 # We update the function definition to accept the new insurance fields
 @tool("book_slot", args_schema=BookSlotInput)
 def book_slot_tool(first_name, last_name, dob, phone, email, doctor, slot_date, slot_time, duration_minutes, insurance_carrier, member_id, group_number) -> dict:
@@ -128,41 +293,30 @@ def book_slot_tool(first_name, last_name, dob, phone, email, doctor, slot_date,
     
     DOCTOR_SCHEDULE_FILE = "doctor_schedule.xlsx"
     try:
-        df = pd.read_excel(DOCTOR_SCHEDULE_FILE)
-        df['datetime'] = pd.to_datetime(df['date'].astype(str) + ' ' + df['time'].astype(str))
-        
+        if duration_minutes not in (30, 60):
+            return {"status": "error", "message": "Invalid duration."}
+
+        df = load_schedule(DOCTOR_SCHEDULE_FILE)
         slot_datetime = pd.to_datetime(f"{slot_date} {slot_time}")
-        
-        mask1 = (df['doctor'].str.lower() == doctor.lower()) & (df['datetime'] == slot_datetime) & (df['status'] == "available")
-
-        if duration_minutes == 30:
-            if mask1.any():
-                idx1 = df[mask1].index[0]
-                df.at[idx1, 'status'] = "booked"
-                df.drop(columns=['datetime']).to_excel(DOCTOR_SCHEDULE_FILE, index=False)
-            else:
+
+        blocks = find_free_blocks(df, doctor, slot_datetime, duration_minutes)
+        if blocks is None:
+            if duration_minutes == 30:
                 return {"status": "error", "message": "The selected 30-minute slot is no longer available."}
-        
-        elif duration_minutes == 60:
-            slot_datetime_plus_30 = slot_datetime + pd.Timedelta(minutes=30)
-            mask2 = (df['doctor'].str.lower() == doctor.lower()) & (df['datetime'] == slot_datetime_plus_30) & (df['status'] == "available")
-            
-            if mask1.any() and mask2.any():
-                idx1 = df[mask1].index[0]
-                idx2 = df[mask2].index[0]
-                df.at[idx1, 'status'] = "booked"
-                df.at[idx2, 'status'] = "booked (part 2)"
-                df.drop(columns=['datetime']).to_excel(DOCTOR_SCHEDULE_FILE, index=False)
-            else:
-                return {"status": "error", "message": "The full 60-minute slot is not available."}
-        
-        else:
-            return {"status": "error", "message": "Invalid duration."}
+            return {"status": "error", "message": "The full 60-minute slot is not available."}
 
-        # If booking was successful, continue 
+        # Every block the appointment occupies is tagged with its id, so it can be released later
         scheduled_iso = f"{slot_date} {slot_time}"
         aid = create_appointment(pid, doctor, scheduled_iso, duration_minutes)
-        
+        claim_blocks(df, blocks, aid)
+        save_schedule_or_rollback(df, DOCTOR_SCHEDULE_FILE, new_appointment_ids=[aid])
+        # A direct booking satisfies any waitlist entry for the same doctor
+        close_waitlist_entries(pid, doctor, aid)
+
+        # The schedule changed, so cached availability for this doctor is stale
+        slot_cache.invalidate_doctor(doctor)
+
+        # If booking was successful, continue 
         send_email_with_pdf(
             email,
             "Appointment Confirmation",
@@ -171,43 +325,152 @@ def book_slot_tool(first_name, last_name, dob, phone, email, doctor, slot_date,
         )
         schedule_3_reminders(aid, scheduled_iso, email, f"{first_name} {last_name}")
         
-        # ADMIN EXPORT LOGIC 
-        try:
-            ADMIN_REPORT_FILE = "admin_review.xlsx"
-            new_appointment_data = {
-                'patient_name': f"{first_name} {last_name}",
-                'patient_email': email,
-                'patient_phone': phone,
-                'doctor': doctor,
-                'appointment_date': slot_date,
-                'appointment_time': slot_time,
-                'duration': duration_minutes,
-                'insurance_carrier': insurance_carrier,
-                'member_id': member_id,
-                'group_number': group_number
-            }
-            
-            # Try to read the existing file, or create a new dataframe
-            try:
-                admin_df = pd.read_excel(ADMIN_REPORT_FILE)
-            except FileNotFoundError:
-                admin_df = pd.DataFrame()
-                
-            # Append the new appointment and save
-            admin_df = pd.concat([admin_df, pd.DataFrame([new_appointment_data])], ignore_index=True)
-            admin_df.to_excel(ADMIN_REPORT_FILE, index=False)
-            
-        except Exception as e:
-            print(f"Error in admin export: {e}") # Don't crash the whole booking if this fails
-        
-        # END ADMIN EXPORT LOGIC 
+        _export_admin_row({
+            'appointment_id': aid,
+            'status': "confirmed",
+            'patient_name': f"{first_name} {last_name}",
+            'patient_email': email,
+            'patient_phone': phone,
+            'doctor': doctor,
+            'appointment_date': slot_date,
+            'appointment_time': slot_time,
+            'duration': duration_minutes,
+            'insurance_carrier': insurance_carrier,
+            'member_id': member_id,
+            'group_number': group_number
+        })
         return {"status": "success", "message": f"Appointment ({duration_minutes} min) booked successfully", "appointment_id": aid}
         
     except Exception as e:
         print(f"Error in book_slot_tool: {e}")
         return {"status": "error", "message": str(e)}
 
-tools = [lookup_patient_tool, list_available_slots_tool, book_slot_tool]
+@tool("cancel_appointment", args_schema=CancelAppointmentInput)
+def cancel_appointment_tool(appointment_id: int, last_name: str, dob: str) -> dict:
+    """
+    Cancel a confirmed appointment and free its slots.
+    Freed slots are offered to the doctor's waitlist straight away.
+    """
+    appt, error = _verify_appointment_owner(appointment_id, last_name, dob)
+    if error:
+        return error
+    _, patient_id, doctor, scheduled_iso, duration, _ = appt
+
+    DOCTOR_SCHEDULE_FILE = "doctor_schedule.xlsx"
+    try:
+        df = load_schedule(DOCTOR_SCHEDULE_FILE)
+        freed = release_blocks(df, appointment_id)
+        if not freed:
+            return {"status": "error", "message": f"No schedule slots are linked to appointment {appointment_id}, so it was not cancelled."}
+        notifications = _backfill_from_waitlist(df, doctor, freed, exclude_patient_id=patient_id)
+        save_schedule_or_rollback(df, DOCTOR_SCHEDULE_FILE,
+                                  waitlist_bookings=[(n["appointment_id"], n["waitlist_id"]) for n in notifications])
+        update_appointment(appointment_id, status="cancelled")
+        slot_cache.invalidate_doctor(doctor)
+
+        patient = get_patient_by_id(patient_id)
+        send_email_with_pdf(
+            patient[5],
+            "Appointment Cancelled",
+            f"Hello {patient[1]}, your appointment with {doctor} on {scheduled_iso} has been cancelled.",
+            attach_form=False
+        )
+        _update_admin_row(appointment_id, {'status': "cancelled"})
+        _send_waitlist_notifications(notifications)
+
+        return {
+            "status": "success",
+            "message": f"Appointment {appointment_id} cancelled.",
+            "released_slots": len(freed),
+            "waitlist_bookings": [n["appointment_id"] for n in notifications]
+        }
+
+    except Exception as e:
+        print(f"Error in cancel_appointment_tool: {e}")
+        return {"status": "error", "message": str(e)}
+
+@tool("reschedule_appointment", args_schema=RescheduleAppointmentInput)
+def reschedule_appointment_tool(appointment_id: int, last_name: str, dob: str, new_slot_date: str, new_slot_time: str) -> dict:
+    """
+    Move a confirmed appointment to a new slot with the same doctor and duration.
+    The old blocks count as free when checking the new slot (so a visit can shift into
+    its own time), and nothing is saved unless the move succeeds.
+    """
+    appt, error = _verify_appointment_owner(appointment_id, last_name, dob)
+    if error:
+        return error
+    _, patient_id, doctor, old_iso, duration, _ = appt
+
+    DOCTOR_SCHEDULE_FILE = "doctor_schedule.xlsx"
+    try:
+        df = load_schedule(DOCTOR_SCHEDULE_FILE)
+        new_datetime = pd.to_datetime(f"{new_slot_date} {new_slot_time}")
+        if new_datetime <= pd.Timestamp.now():
+            return {"status": "error", "message": f"{new_slot_date} {new_slot_time} has already started or passed; please pick a later slot."}
+
+        # Only the in-memory schedule is touched here; an early return leaves the file unchanged
+        freed = release_blocks(df, appointment_id)
+        if not freed:
+            return {"status": "error", "message": f"No schedule slots are linked to appointment {appointment_id}, so it was not moved."}
+
+        blocks = find_free_blocks(df, doctor, new_datetime, duration)
+        if blocks is None:
+            return {"status": "error", "message": f"The requested {duration}-minute slot is not available."}
+
+        claim_blocks(df, blocks, appointment_id)
+        freed = [idx for idx in freed if idx not in blocks]
+        notifications = _backfill_from_waitlist(df, doctor, freed, exclude_patient_id=patient_id)
+        save_schedule_or_rollback(df, DOCTOR_SCHEDULE_FILE,
+                                  waitlist_bookings=[(n["appointment_id"], n["waitlist_id"]) for n in notifications])
+        new_iso = f"{new_slot_date} {new_slot_time}"
+        update_appointment(appointment_id, scheduled_time=new_iso)
+        slot_cache.invalidate_doctor(doctor)
+
+        patient = get_patient_by_id(patient_id)
+        send_email_with_pdf(
+            patient[5],
+            "Appointment Rescheduled",
+            f"Hello {patient[1]}, your appointment with {doctor} has moved from {old_iso} to {new_iso}.",
+            attach_form=False
+        )
+        schedule_3_reminders(appointment_id, new_iso, patient[5], f"{patient[1]} {patient[2]}")
+        _update_admin_row(appointment_id, {'appointment_date': new_slot_date, 'appointment_time': new_slot_time})
+        _send_waitlist_notifications(notifications)
+
+        return {
+            "status": "success",
+            "message": f"Appointment {appointment_id} moved to {new_iso}.",
+            "waitlist_bookings": [n["appointment_id"] for n in notifications]
+        }
+
+    except Exception as e:
+        print(f"Error in reschedule_appointment_tool: {e}")
+        return {"status": "error", "message": str(e)}
+
+@tool("join_waitlist", args_schema=JoinWaitlistInput)
+def join_waitlist_tool(first_name: str, last_name: str, dob: str, phone: str, email: str, doctor: str, duration_minutes: int) -> dict:
+    """
+    Add a patient to a doctor's waitlist. They are booked automatically
+    (and emailed) as soon as a cancellation frees a matching slot.
+    """
+    if duration_minutes not in (30, 60):
+        return {"status": "error", "message": "Invalid duration."}
+
+    patient = find_patient_by_name_dob(last_name, dob)
+    if patient:
+        pid = patient[0]
+    else:
+        pid = create_patient(first_name, last_name, dob, phone, email, {})
+
+    # One open entry per patient and doctor, or two cancellations would book them twice
+    existing = find_waitlist_entry(pid, doctor)
+    if existing:
+        return {"status": "success", "message": f"Already on the waitlist for {doctor}.", "waitlist_id": existing}
+
+    wid = add_to_waitlist(pid, doctor, duration_minutes)
+    return {"status": "success", "message": f"Added to the waitlist for {doctor}.", "waitlist_id": wid}
+
+tools = [lookup_patient_tool, list_available_slots_tool, book_slot_tool, cancel_appointment_tool, reschedule_appointment_tool, join_waitlist_tool]
 
 # 3. DEFINE LANGGRAPH NODES
 base_llm = ChatGoogleGenerativeAI(
@@ -237,6 +500,12 @@ def chat_node(state: AgentState):
         7.  **Book:** Once you have ALL information (first_name, last_name, dob, doctor, slot_date, slot_time, phone, email, duration, AND all three insurance details), you MUST call the `book_slot` tool.
         8.  **Confirm:** Tell the user the booking is complete and say goodbye.
         
+        If no listed slot works for the user, offer the waitlist: collect first_name, last_name, dob, phone and email, then call `join_waitlist` with the doctor and duration. They will be booked and emailed automatically when a slot frees up.
+
+        **Cancel / Reschedule:** If the user wants to cancel or move an existing appointment, ask for their **appointment ID**, **last name** and **date of birth**.
+            -   To cancel, call `cancel_appointment`.
+            -   To reschedule, use `list_available_slots` for the same doctor and duration, let them pick, then call `reschedule_appointment` with the new date and time.
+
         IMPORTANT: Do not ask for insurance until *after* phone/email. Do not call `book_slot` until you have *all* pieces of information.
         """),
         ("placeholder", "{messages}")
@@ -259,7 +528,10 @@ def tool_node(state: AgentState):
         tool_dispatcher = {
             "lookup_patient": lookup_patient_tool,
             "list_available_slots": list_available_slots_tool,
-            "book_slot": book_slot_tool
+            "book_slot": book_slot_tool,
+            "cancel_appointment": cancel_appointment_tool,
+            "reschedule_appointment": reschedule_appointment_tool,
+            "join_waitlist": join_waitlist_tool
         }
         
         if tool_name in tool_dispatcher:
@@ -335,7 +607,7 @@ def load_admin_data():
         return df
     except FileNotFoundError:
         return pd.DataFrame(columns=[
-            'patient_name', 'patient_email', 'patient_phone', 'doctor', 
+            'appointment_id', 'status', 'patient_name', 'patient_email', 'patient_phone', 'doctor', 
             'appointment_date', 'appointment_time', 'duration', 
             'insurance_carrier', 'member_id', 'group_number'
         ])
@@ -343,6 +615,12 @@ def load_admin_data():
         print(f"Error loading admin data: {e}")
         return pd.DataFrame({"Error": [str(e)]})
 
+def load_cache_stats():
+    """
+    Returns hit/miss counters for the availability cache (used to size it).
+    """
+    return slot_cache.stats()
+
 ###  NEW ADMIN LOGIN FUNCTION 
 def admin_login(password):
     """
@@ -365,6 +643,7 @@ def admin_login(password):
 if __name__ == "__main__":
     init_db()
     generate_doctor_schedule()
+    migrate_legacy_bookings()
 
     with gr.Blocks() as demo:
         gr.Markdown("# AI Patient Scheduling Assistant")
@@ -385,7 +664,7 @@ if __name__ == "__main__":
                 gr.Markdown("Click 'Refresh Data' to see the latest bookings from `admin_review.xlsx`.")
                 
                 admin_dataframe = gr.DataFrame(headers=[
-                    'patient_name', 'doctor', 'appointment_date', 'appointment_time', 
+                    'appointment_id', 'status', 'patient_name', 'doctor', 'appointment_date', 'appointment_time', 
                     'duration', 'patient_email', 'patient_phone', 
                     'insurance_carrier', 'member_id', 'group_number'
                 ])
@@ -397,6 +676,16 @@ if __name__ == "__main__":
                     inputs=None,
                     outputs=[admin_dataframe]
                 )
+
+                gr.Markdown("## Availability Cache")
+                cache_stats = gr.JSON()
+                cache_button = gr.Button("Refresh Cache Stats")
+
+                cache_button.click(
+                    fn=load_cache_stats,
+                    inputs=None,
+                    outputs=[cache_stats]
+                )
             
             with gr.Tab("Admin Login") as login_tab:
                 gr.Markdown("## Admin Access")
@@ -0,0 +1,86 @@
+import pandas as pd
+from db import get_confirmed_appointments, update_appointment, mark_waitlist_waiting
+
+DOCTOR_SCHEDULE_FILE = "doctor_schedule.xlsx"
+
+# Shared by the agent tools in main.py and the standalone helpers in tools.py,
+# so every booking path tags schedule blocks with the appointment that owns them.
+
+def load_schedule(schedule_file=DOCTOR_SCHEDULE_FILE):
+    """Read the schedule and add the helper columns the booking tools rely on."""
+    df = pd.read_excel(schedule_file)
+    if 'appointment_id' not in df.columns:
+        # Older schedule files predate slot -> appointment linking
+        df['appointment_id'] = None
+    df['appointment_id'] = df['appointment_id'].astype('Int64')
+    df['datetime'] = pd.to_datetime(df['date'].astype(str) + ' ' + df['time'].astype(str))
+    return df
+
+def migrate_legacy_bookings(schedule_file=DOCTOR_SCHEDULE_FILE):
+    """
+    One-off startup migration: tag booked rows written before slot -> appointment
+    linking (bare "booked" / "booked (part 2)") with the confirmed appointment that
+    owns them, matched on doctor, start time and duration, and save the result.
+    Rows with no matching appointment are reported and left booked.
+    """
+    print("Linking legacy bookings to appointments...")
+    df = load_schedule(schedule_file)
+    unlinked = df['status'].astype(str).str.startswith("booked") & df['appointment_id'].isna()
+    if not unlinked.any():
+        print("No legacy bookings to link.")
+        return
+    lookup = {(df.at[idx, 'doctor'].lower(), df.at[idx, 'datetime']): idx for idx in df.index[unlinked]}
+    for aid, doctor, scheduled_time, duration in get_confirmed_appointments():
+        start = pd.to_datetime(scheduled_time, errors='coerce')
+        if pd.isna(start):
+            continue
+        keys = [(doctor.lower(), start + pd.Timedelta(minutes=30 * k)) for k in range(duration // 30)]
+        if not keys or any(key not in lookup for key in keys):
+            continue
+        claim_blocks(df, [lookup.pop(key) for key in keys], aid)
+
+    save_schedule(df, schedule_file)
+    print(f"Linked {unlinked.sum() - len(lookup)} legacy rows; {len(lookup)} booked rows have no matching appointment.")
+
+def save_schedule(df, schedule_file=DOCTOR_SCHEDULE_FILE):
+    df.drop(columns=['datetime']).to_excel(schedule_file, index=False)
+
+def save_schedule_or_rollback(df, schedule_file=DOCTOR_SCHEDULE_FILE, new_appointment_ids=(), waitlist_bookings=()):
+    """
+    Save the schedule. Appointment ids are needed to tag the blocks, so the DB rows
+    are written first; if the save fails (e.g. the file is open in Excel) they are
+    undone so no appointment stays confirmed without slots. `waitlist_bookings` is a
+    list of (appointment_id, waitlist_id) pairs. Re-raises the error.
+    """
+    try:
+        save_schedule(df, schedule_file)
+    except Exception:
+        for aid in new_appointment_ids:
+            update_appointment(aid, status="cancelled")
+        for aid, waitlist_id in waitlist_bookings:
+            update_appointment(aid, status="cancelled")
+            mark_waitlist_waiting(waitlist_id)
+        raise
+
+def find_free_blocks(df, doctor, slot_datetime, duration_minutes):
+    """Row indices of the consecutive 30-min blocks needed for a booking, or None if any is taken."""
+    indices = []
+    for k in range(duration_minutes // 30):
+        block_time = slot_datetime + pd.Timedelta(minutes=30 * k)
+        mask = (df['doctor'].str.lower() == doctor.lower()) & (df['datetime'] == block_time) & (df['status'] == "available")
+        if not mask.any():
+            return None
+        indices.append(df[mask].index[0])
+    return indices
+
+def claim_blocks(df, indices, appointment_id):
+    for idx in indices:
+        df.at[idx, 'status'] = "booked"
+        df.at[idx, 'appointment_id'] = appointment_id
+
+def release_blocks(df, appointment_id):
+    """Free exactly the blocks owned by an appointment. Returns the freed row indices in time order."""
+    owned = df.index[(df['appointment_id'] == appointment_id).fillna(False)]
+    df.loc[owned, 'status'] = "available"
+    df.loc[owned, 'appointment_id'] = pd.NA
+    return sorted(owned, key=lambda idx: df.at[idx, 'datetime'])
@@ -0,0 +1,112 @@
+import time
+import threading
+from collections import OrderedDict
+from datetime import date
+
+class SlotCache:
+    """
+    LRU + TTL cache for `list_available_slots` results.
+    Keys are (doctor, duration, window). Entries for a doctor are dropped
+    whenever one of that doctor's slots is booked or released.
+    """
+
+    def __init__(self, max_entries=128, ttl_seconds=300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()   # key -> (expires_at, slots)
+        self._keys_by_doctor = {}       # doctor -> set of keys, for targeted invalidation
+        self._generations = {}          # doctor -> bumped on every invalidation
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    @staticmethod
+    def normalise_doctor(doctor):
+        return doctor.strip().lower()
+
+    @staticmethod
+    def make_key(doctor, duration_minutes, window=None):
+        """Normalise a query into a cache key. `window` defaults to today's date."""
+        return (SlotCache.normalise_doctor(doctor), int(duration_minutes), window or date.today().isoformat())
+
+    def generation(self, doctor):
+        """
+        Current invalidation counter for a doctor. Read it before computing a
+        result and pass it to `put`, so a booking that lands mid-computation
+        stops the stale result from being stored.
+        """
+        with self._lock:
+            return self._generations.get(self.normalise_doctor(doctor), 0)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, slots = entry
+            if expires_at < time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Hand out a copy so callers can't mutate the cached list
+            return [dict(s) for s in slots]
+
+    def put(self, key, slots, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key[0], 0):
+                self.stale_puts += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, [dict(s) for s in slots])
+            self._keys_by_doctor.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate_doctor(self, doctor):
+        """Drop every cached query for this doctor (called after a booking or cancellation)."""
+        doctor = self.normalise_doctor(doctor)
+        with self._lock:
+            self._generations[doctor] = self._generations.get(doctor, 0) + 1
+            for key in self._keys_by_doctor.pop(doctor, set()):
+                self._entries.pop(key, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_doctor.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def _drop(self, key):
+        # Caller must hold the lock
+        self._entries.pop(key, None)
+        keys = self._keys_by_doctor.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_doctor[key[0]]
+
+# Shared instance used by the agent tools
+slot_cache = SlotCache()
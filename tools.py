@@ -1,9 +1,9 @@
 import pandas as pd
-from db import find_patient_by_name_dob, create_patient, create_appointment
+from db import find_patient_by_name_dob, create_patient, create_appointment, close_waitlist_entries
 from email_utils import send_email_with_pdf
 from scheduler import schedule_3_reminders
-
-DOCTOR_SCHEDULE_FILE = "doctor_schedule.xlsx"
+from slot_cache import slot_cache
+from schedule_utils import DOCTOR_SCHEDULE_FILE, load_schedule, save_schedule_or_rollback, find_free_blocks, claim_blocks
 
 def lookup_patient_tool(first_name, last_name, dob):
     """Find a patient record by last name and date of birth."""
@@ -21,15 +21,16 @@ def book_slot_tool(first_name,last_name,dob,phone,email,doctor,slot_date,slot_ti
         pid = create_patient(first_name,last_name,dob,phone,email, insurance or {})
     else:
         pid = p[0] 
-    df = pd.read_excel(DOCTOR_SCHEDULE_FILE)
-    mask = (df['doctor']==doctor) & (df['date']==slot_date) & (df['time']==slot_time) & (df['status']=="available")
-    if mask.any():
-        idx = df[mask].index[0]
-        df.at[idx,'status']="booked"
-        df.to_excel(DOCTOR_SCHEDULE_FILE,index=False)
+    df = load_schedule(DOCTOR_SCHEDULE_FILE)
+    duration = 60 if is_new_patient else 30
+    blocks = find_free_blocks(df, doctor, pd.to_datetime(f"{slot_date} {slot_time}"), duration)
+    if blocks is not None:
         scheduled_iso = f"{slot_date} {slot_time}"
-        duration = 60 if is_new_patient else 30
         aid = create_appointment(pid, doctor, scheduled_iso, duration)
+        claim_blocks(df, blocks, aid)
+        save_schedule_or_rollback(df, DOCTOR_SCHEDULE_FILE, new_appointment_ids=[aid])
+        close_waitlist_entries(pid, doctor, aid)
+        slot_cache.invalidate_doctor(doctor)
         
         # Trigger email and reminders
         send_email_with_pdf(email, "Appointment Confirmation", f"Hello {first_name}, your appointment with {doctor} is confirmed for {scheduled_iso}. An intake form is attached.", attach_form=True)